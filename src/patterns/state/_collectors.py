@@ -1,14 +1,28 @@
 # Standard Library
-from collections import defaultdict
 import enum
+import functools
 import inspect
-import itertools
 import logging
+import operator
 from types import MappingProxyType
-from typing import Any, Callable, Dict, Optional, Set, Type
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
 
 # Patterns
-from patterns.state._common import get_relevant_members, resolve_type
+from patterns.state._common import (
+    get_init_param_annotations,
+    get_relevant_members,
+    resolve_type,
+)
 from patterns.state._exceptions import StateConfigError, StateError
 from patterns.state._structs import (
     Implementation,
@@ -20,6 +34,7 @@ from patterns.state._structs import (
 
 TRANSITION_MARKER_KEY = '__patterns_state_transition__'
 METHOD_MARKER_KEY = '__patterns_state_method__'
+STATE_CLS_TYPE_KEY = 'state_cls_type'
 DEFAULT_IMPLEMENTATION_CLS_KEY = 'default_state_cls'
 
 
@@ -53,46 +68,58 @@ class StateMemberDescriptor:
         self,
         state_attr_name: str,
         attr_name: str,
-        implementation_map: Dict[Type, Set[str]],
+        dispatch: Dict[Type, Callable[[Any], Any]],
     ):
         self.state_attr_name = state_attr_name
         self.attr_name = attr_name
-        self.implementations = implementation_map
+        # maps each state class implementing the member to a getter for it
+        self.dispatch = dispatch
 
     def __get__(self, instance: Any, owner: Type):
         state_instance = getattr(instance, self.state_attr_name)
-        implemented_members = self.implementations[state_instance.__class__]
-        if self.attr_name not in implemented_members:
+        try:
+            member_getter = self.dispatch[state_instance.__class__]
+        except KeyError:
             raise StateError(
                 f'Member {self.attr_name} is not available on class '
                 f'{owner.__qualname__} in state {state_instance.__class__.__qualname__}.'
-            )
-        return getattr(state_instance, self.attr_name)
-
+            ) from None
+        return member_getter(state_instance)
 
-class StateTransitionWrapper:
-    def __init__(self, instance: Any, state_attr_name: str, transition: Callable):
-        self.instance = instance
-        self.state_attr_name = state_attr_name
-        self.transition = transition
 
-    def __call__(self, *args, **kwargs):
-        new_state = self.transition(*args, **kwargs)
-        setattr(self.instance, self.state_attr_name, new_state)
+# positional-only, so that they never clash with the arguments of the transition
+def apply_state_transition(
+    instance: Any, state_attr_name: str, transition: Callable, /, *args, **kwargs
+):
+    new_state = transition(*args, **kwargs)
+    setattr(instance, state_attr_name, new_state)
 
 
 class StateTransitionDescriptor(StateMemberDescriptor):
     def __get__(self, instance: Any, owner: Type):
-        return StateTransitionWrapper(
+        # partial is created in C, which is considerably cheaper than initializing a
+        # python wrapper object on every attribute access
+        return functools.partial(
+            apply_state_transition,
             instance,
             self.state_attr_name,
-            transition=super().__get__(instance, owner),
+            super().__get__(instance, owner),
         )
 
 
+DESCRIPTOR_CLS_MAP: Dict[Type[StateMember], Type[StateMemberDescriptor]] = {
+    StateAttribute: StateMemberDescriptor,
+    StateMethod: StateMemberDescriptor,
+    StateTransition: StateTransitionDescriptor,
+}
+
+
 class StateDefinition:
     """Main class for the api. Clients inherit from it to make use of state pattern."""
 
+    # so that subclasses can fully opt into __slots__
+    __slots__ = ()
+
     def __init_subclass__(cls, **kwargs):
         _global_state_collector.collect(cls, cls_kwargs=kwargs)
 
@@ -101,10 +128,7 @@ class StateCollector:
     def __init__(self, definition: Type):
         self.definition = definition
         self.state_members = MappingProxyType(
-            {
-                member.name: member
-                for member in self.collect_state_members_from_definition()
-            }
+            self.collect_state_members_from_definition()
         )
         self._resolved = False
 
@@ -122,20 +146,23 @@ class StateCollector:
 
         self.implementation_cls_init_map: Dict[Type, Callable] = {}
         self.used_by_holder = False
+        self._transition_map: Optional[
+            MappingProxyType[Type, FrozenSet[StateTransition]]
+        ] = None
+        # (state-attribute name, member name) -> descriptor, shared by all holders
+        self.member_descriptors: Dict[Tuple[str, str], StateMemberDescriptor] = {}
 
     def resolve(self):
         self._resolved = True
 
-    def collect_state_members_from_definition(self) -> Set[StateMember]:
-        state_members = set()
+    def collect_state_members_from_definition(self) -> Dict[str, StateMember]:
+        state_members = {}
 
         for name, annotation in self.definition.__annotations__.items():
-            state_members.add(
-                StateAttribute(
-                    name,
-                    defined_on=self.definition,
-                    definition=annotation,
-                )
+            state_members[name] = StateAttribute(
+                name,
+                defined_on=self.definition,
+                definition=annotation,
             )
 
         unhandled_members = []
@@ -154,7 +181,7 @@ class StateCollector:
                 else:
                     state_member_cls = StateMethod
 
-                state_members.add(state_member_cls(**init_kwargs))
+                state_members[name] = state_member_cls(**init_kwargs)
             else:
                 unhandled_members.append(member)
 
@@ -174,38 +201,27 @@ class StateCollector:
                 'resolved, i.e. used in a state-holder-class.'
             )
 
-        collected_at_least_one_implementation = False
-        for name, member in [
-            *[
-                (param.name, param.annotation)
-                for param in inspect.signature(
-                    implementation_cls.__init__
-                ).parameters.values()
-            ],
-            *[
-                (name, annotation)
-                for name, annotation in implementation_cls.__annotations__.items()
-            ],
-            *[
-                (name, member)
-                for name, member in get_relevant_members(implementation_cls)
-            ],
-        ]:
-            if name not in self.state_members:
-                continue
-
-            collected_at_least_one_implementation = True
-            state_member = self.state_members[name]
-            state_member.add_implementation(
-                Implementation(on=implementation_cls, implementation=member)
-            )
-
-        if not collected_at_least_one_implementation:
+        # implementations are added below, so a computed transition-map is outdated
+        self._transition_map = None
+        # later sources take precedence: members defined on the class over
+        # class-annotations over init-parameters
+        candidates = {
+            **get_init_param_annotations(implementation_cls),
+            **implementation_cls.__annotations__,
+            **dict(get_relevant_members(implementation_cls)),
+        }
+        implemented_names = candidates.keys() & self.state_members.keys()
+        if not implemented_names:
             raise StateConfigError(
                 f'State class {implementation_cls.__qualname__} must implement at least'
                 f' one state-member.'
             )
 
+        for name in implemented_names:
+            self.state_members[name].add_implementation(
+                Implementation(on=implementation_cls, implementation=candidates[name])
+            )
+
         original_init = implementation_cls.__init__
         self.implementation_cls_init_map[implementation_cls] = (
             original_init
@@ -215,12 +231,32 @@ class StateCollector:
         implementation_cls.__init__ = state_cls_init
 
     @property
-    def member_names(self):
-        return set(member.name for member in self.members)
+    def transition_map(self) -> MappingProxyType[Type, FrozenSet[StateTransition]]:
+        """Maps each state-implementation class to the transitions it implements."""
+        if self._transition_map is None:
+            transition_map: Dict[Type, Set[StateTransition]] = {}
+            for member in self.members:
+                if not isinstance(member, StateTransition):
+                    continue
+                for impl in member.implementations:
+                    transition_map.setdefault(impl.on, set()).add(member)
+
+            self._transition_map = MappingProxyType(
+                {
+                    impl_cls: frozenset(transitions)
+                    for impl_cls, transitions in transition_map.items()
+                }
+            )
+        return self._transition_map
 
-    @property
-    def members(self):
-        return set(self.state_members.values())
+    # state_members is fixed at init, only the members' implementations grow later
+    @functools.cached_property
+    def member_names(self) -> FrozenSet[str]:
+        return frozenset(self.state_members.keys())
+
+    @functools.cached_property
+    def members(self) -> FrozenSet[StateMember]:
+        return frozenset(self.state_members.values())
 
 
 class GlobalCollector:
@@ -228,27 +264,17 @@ class GlobalCollector:
         self.state_collectors: Dict[Type, StateCollector] = {}
 
     def collect(self, cls: Type, cls_kwargs: Dict[str, Any]):
-        try:
-            state_cls_type = StateClsType(cls_kwargs['state_cls_type'])
-        except (KeyError, ValueError):
-            raise StateConfigError(
-                f"Subclass {cls.__qualname__} must set 'state_cls_type' in class "
-                f"definition, like\n "
-                f"class {cls.__name__}"
-                f"({', '.join([base.__name__ for base in cls.__bases__])},"
-                f" state_cls_type=...)"
-                f"\nwhere ... is one of {list(StateClsType)}."
-            )
-
-        if state_cls_type is StateClsType.definition:
+        # StateClsType members are strings, so comparing against them accepts both
+        # plain strings and members without coercing through the enum
+        state_cls_type = cls_kwargs.get(STATE_CLS_TYPE_KEY)
+        if state_cls_type == StateClsType.definition:
             self.validate_definition_bases(definition=cls)
             self.state_collectors[cls] = StateCollector(definition=cls)
-            return
-        elif state_cls_type is StateClsType.state:
+        elif state_cls_type == StateClsType.state:
             definition = self.find_definition_for_implementation(state_cls=cls)
             state_collector = self.state_collectors[definition]
             state_collector.collect_implementations(implementation_cls=cls)
-        elif state_cls_type is StateClsType.holder:
+        elif state_cls_type == StateClsType.holder:
             resolver = StateHolderResolver(
                 cls,
                 MappingProxyType(cls_kwargs),
@@ -256,15 +282,23 @@ class GlobalCollector:
             )
             resolver.resolve()
         else:
-            raise NotImplementedError(
-                f'Unhandled StateClsType {state_cls_type}. This is a bug.'
-            )
+            raise self.create_state_cls_type_error(cls)
+
+    @staticmethod
+    def create_state_cls_type_error(cls: Type) -> StateConfigError:
+        return StateConfigError(
+            f"Subclass {cls.__qualname__} must set '{STATE_CLS_TYPE_KEY}' in class "
+            f"definition, like\n "
+            f"class {cls.__name__}"
+            f"({', '.join([base.__name__ for base in cls.__bases__])},"
+            f" {STATE_CLS_TYPE_KEY}=...)"
+            f"\nwhere ... is one of {list(StateClsType)}."
+        )
 
     def find_definition_for_implementation(self, state_cls: Type) -> Type:
-        definition_bases = set(
-            base for base in reversed(state_cls.mro()) if base in self.state_collectors
-        )
+        definition_bases = self.state_collectors.keys() & state_cls.__mro__
         if len(definition_bases) > 1:
+            definition_bases = sorted(definition_bases, key=lambda b: b.__qualname__)
             raise StateConfigError(
                 f'State-implementation classes should inherit from exactly one '
                 f'definition. Class {state_cls.__qualname__} ininherits from more than'
@@ -312,7 +346,7 @@ class StateHolderResolver:
     def resolve(self):
         self.validate_no_definition_overlap()
 
-        for name, definition in self.get_state_holder_annotations():
+        for name, definition in self.state_holder_annotations:
             StateHolderDefinitionResolver(
                 holder_cls=self.holder_cls,
                 holder_cls_kwargs=self.holder_cls_kwargs,
@@ -321,21 +355,31 @@ class StateHolderResolver:
             ).resolve()
 
     def validate_no_definition_overlap(self):
-        common_member_messages = []
-        state_holder_annotations = self.get_state_holder_annotations()
-        for (name1, definition1), (name2, definition2) in itertools.product(
-            state_holder_annotations, state_holder_annotations
-        ):
-            if definition1 is not definition2:
-                members1 = self.state_collectors[definition1].member_names
-                members2 = self.state_collectors[definition2].member_names
-                common = members1.intersection(members2)
-                if common:
-                    common_member_messages.append(
-                        f'Definition of state-attributes {name1} and {name2} with '
-                        f'types {definition1.__qualname__} and '
-                        f'{definition2.__qualname__} have common member names {common}.'
-                    )
+        # the common case, where there is nothing to overlap with
+        if len(self.state_holder_annotations) <= 1:
+            return
+
+        # member name -> every state-attribute declaring it so far, with its definition
+        declared: Dict[str, List[Tuple[str, Type]]] = {}
+        common_members: Dict[Tuple[str, Type, str, Type], Set[str]] = {}
+        for name, definition in self.state_holder_annotations:
+            for member_name in self.state_collectors[definition].member_names:
+                earlier_declarers = declared.setdefault(member_name, [])
+                for earlier_name, earlier_definition in earlier_declarers:
+                    if earlier_definition is not definition:
+                        common_members.setdefault(
+                            (earlier_name, earlier_definition, name, definition), set()
+                        ).add(member_name)
+                earlier_declarers.append((name, definition))
+
+        common_member_messages = [
+            f'Definition of state-attributes {name1} and {name2} with '
+            f'types {definition1.__qualname__} and '
+            f'{definition2.__qualname__} have common member names {common}.'
+            for (name1, definition1, name2, definition2), common in (
+                common_members.items()
+            )
+        ]
 
         if common_member_messages:
             msg = '\n'.join(common_member_messages)
@@ -344,17 +388,13 @@ class StateHolderResolver:
                 f'have common member names, which is not permittee: {msg}'
             )
 
-    def get_state_holder_annotations(self):
+    @functools.cached_property
+    def state_holder_annotations(self) -> List[Tuple[str, Type]]:
         state_holder_annotations = []
         invalid_annotations = []
 
         all_annotations = {
-            **{
-                param.name: param.annotation
-                for param in inspect.signature(
-                    self.holder_cls.__init__
-                ).parameters.values()
-            },
+            **get_init_param_annotations(self.holder_cls),
             **self.holder_cls.__annotations__,
         }
 
@@ -424,16 +464,17 @@ class StateHolderDefinitionResolver:
                 f' delete or implement them.'
             )
 
-    def get_state_implementation_classes(self):
+    @functools.cached_property
+    def state_implementation_classes(self) -> FrozenSet[Type]:
         definition_members = self.state_collector.members
-        return set(
+        return frozenset(
             implementation.on
             for member in definition_members
             for implementation in member.implementations
         )
 
     def validate_default_implementation_cls(self) -> Optional[Type]:
-        state_implementation_classes = self.get_state_implementation_classes()
+        state_implementation_classes = self.state_implementation_classes
 
         try:
             default_implementation_cls = self.holder_cls_kwargs[
@@ -460,31 +501,41 @@ class StateHolderDefinitionResolver:
         return default_implementation_cls
 
     def validate_transitions_reach_all_states(self):
-        state_implementation_classes = self.get_state_implementation_classes()
-        reachable_states = set()
-        # get the default as a start or arbitrary one if the default is not given
+        state_implementation_classes = list(self.state_implementation_classes)
         default_implementation_cls = self.validate_default_implementation_cls()
-        states_to_check = {
-            default_implementation_cls or state_implementation_classes.pop()
-        }
 
-        state_transition_map = defaultdict(set)
-        for member in self.state_collector.members:
-            if not isinstance(member, StateTransition):
-                continue
-            for impl in member.implementations:
-                state_transition_map[impl.on].add(member)
-
-        while states_to_check:
-            implementation_cls = states_to_check.pop()
-            reachable_states.add(implementation_cls)
-            for transition in state_transition_map[implementation_cls]:
-                module = implementation_cls.__module__
-                to = resolve_type(module, type_=transition.to)
-                if to not in reachable_states:
-                    states_to_check.add(to)
-
-        unreachable_states = state_implementation_classes.difference(reachable_states)
+        # each state is represented by one bit, so the search below can merge sets
+        # of states with integer operations
+        state_bits = {
+            impl_cls: 1 << index
+            for index, impl_cls in enumerate(state_implementation_classes)
+        }
+        transition_map = self.state_collector.transition_map
+        # bit-index of a state -> bits of the states it can transition to
+        adjacency = []
+        for impl_cls in state_implementation_classes:
+            targets = 0
+            for transition in transition_map.get(impl_cls, ()):
+                to = transition.resolve_to(impl_cls.__module__)
+                targets |= state_bits.get(to, 0)
+            adjacency.append(targets)
+
+        # start from the default or an arbitrary one if the default is not given
+        reachable = frontier = state_bits[
+            default_implementation_cls or state_implementation_classes[0]
+        ]
+        while frontier:
+            targets = 0
+            while frontier:
+                lowest_bit = frontier & -frontier
+                targets |= adjacency[lowest_bit.bit_length() - 1]
+                frontier ^= lowest_bit
+            frontier = targets & ~reachable
+            reachable |= frontier
+
+        unreachable_states = {
+            impl_cls for impl_cls, bit in state_bits.items() if not bit & reachable
+        }
         if unreachable_states:
             msg_add_on = (
                 ''
@@ -497,29 +548,29 @@ class StateHolderDefinitionResolver:
             )
 
     def set_original_inits(self):
+        # holds exactly the state-implementation classes, see collect_implementations
         impl_cls_init_map = self.state_collector.implementation_cls_init_map
-        for impl_cls in self.get_state_implementation_classes():
-            original_init = impl_cls_init_map[impl_cls]
-            impl_cls.__init__ = original_init
+        for impl_cls, original_init in impl_cls_init_map.items():
+            if impl_cls.__dict__.get('__init__') is not original_init:
+                impl_cls.__init__ = original_init
 
     def set_state_member_descriptors(self):
-        state_members = self.state_collector.members
-        implementation_map = defaultdict(set)
-        for member in state_members:
-            for impl in member.implementations:
-                implementation_map[impl.on].add(member.name)
-
-        implementation_map = dict(implementation_map)
-
-        for member in state_members:
-            descriptor_cls = (
-                StateTransitionDescriptor
-                if isinstance(member, StateTransition)
-                else StateMemberDescriptor
-            )
-            descriptor = descriptor_cls(
-                self.state_attribute_name,
-                attr_name=member.name,
-                implementation_map=implementation_map,
-            )
+        # descriptors only depend on the definition, the state-attribute name and the
+        # member, so holders sharing a definition share the descriptor objects as well
+        member_descriptors = self.state_collector.member_descriptors
+        for member in self.state_collector.members:
+            key = (self.state_attribute_name, member.name)
+            descriptor = member_descriptors.get(key)
+            if descriptor is None:
+                descriptor_cls = DESCRIPTOR_CLS_MAP[type(member)]
+                descriptor = member_descriptors[key] = descriptor_cls(
+                    self.state_attribute_name,
+                    attr_name=member.name,
+                    dispatch=self.get_member_dispatch(member),
+                )
             setattr(self.holder_cls, member.name, descriptor)
+
+    @staticmethod
+    def get_member_dispatch(member: StateMember) -> Dict[Type, Callable[[Any], Any]]:
+        member_getter = operator.attrgetter(member.name)
+        return {impl.on: member_getter for impl in member.implementations}
@@ -1,7 +1,14 @@
 # Standard Library
 import inspect
 import sys
-from typing import Any, List, Tuple, Type, Union
+from types import MappingProxyType
+from typing import Any, Callable, List, Mapping, Tuple, Type, Union
+from weakref import WeakKeyDictionary
+
+# keyed by the (unwrapped) init function, as classes might share or replace it
+_init_param_annotations_cache: 'WeakKeyDictionary[Callable, Mapping[str, Any]]' = (
+    WeakKeyDictionary()
+)
 
 
 def get_relevant_members(cls: Type) -> List[Tuple[str, Any]]:
@@ -13,6 +20,45 @@ def get_relevant_members(cls: Type) -> List[Tuple[str, Any]]:
     ]
 
 
+def get_init_param_annotations(cls: Type) -> Mapping[str, Any]:
+    """Read parameter names and annotations of cls.__init__ from its code object.
+
+    Names come in code-object order: positional (including positional-only) and
+    keyword-only parameters, then *args, then **kwargs. Unannotated parameters map
+    to inspect.Parameter.empty. Decorated inits are unwrapped via __wrapped__, while
+    wrappers without it, e.g. functools.partialmethod, are read as the wrapper
+    itself. Inits without a code object, like object.__init__, yield an empty
+    mapping.
+    """
+    init = inspect.unwrap(cls.__init__)
+    code = getattr(init, '__code__', None)
+    if code is None:  # e.g. object.__init__, which is implemented in C
+        return MappingProxyType({})
+
+    try:
+        return _init_param_annotations_cache[init]
+    except KeyError:
+        pass
+
+    # co_varnames starts with positional and keyword-only parameters followed by the
+    # variadic ones, if present
+    param_count = code.co_argcount + code.co_kwonlyargcount
+    if code.co_flags & inspect.CO_VARARGS:
+        param_count += 1
+    if code.co_flags & inspect.CO_VARKEYWORDS:
+        param_count += 1
+
+    annotations = init.__annotations__
+    param_annotations = MappingProxyType(
+        {
+            name: annotations.get(name, inspect.Parameter.empty)
+            for name in code.co_varnames[:param_count]
+        }
+    )
+    _init_param_annotations_cache[init] = param_annotations
+    return param_annotations
+
+
 def resolve_type(module: str, type_: Union[str, Type]) -> Type:
     if inspect.isclass(type_):
         return type_
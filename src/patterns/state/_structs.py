@@ -1,15 +1,19 @@
 # Standard Library
 from dataclasses import dataclass, field
-from typing import Any, Callable, List, Type, Union
+import itertools
+from typing import Any, Callable, Dict, List, Type, Union
 
+# Patterns
+from patterns.state._common import resolve_type
 
-@dataclass
+
+@dataclass(slots=True)
 class Implementation:
     implementation: Union[str, Type, Callable]
     on: Type
 
 
-@dataclass
+@dataclass(slots=True)
 class StateMemberBase:
     name: str
     defined_on: Type
@@ -24,37 +28,52 @@ class StateMemberBase:
         return bool(self.implementations)
 
 
-def hash_number():
-    num = 0
-    while True:
-        yield num
-        num += 1
-
-
-hash_number_generator = hash_number()
+# bound C-implemented method, which avoids resuming a python generator per member
+next_hash_number = itertools.count().__next__
 
 
 class StateMember(StateMemberBase):
+    __slots__ = ('_hash_number', '_hash')
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._hash_number = next(hash_number_generator)
+        self._hash_number = next_hash_number()
+        # members are hashed on every set/dict operation, the number never changes
+        self._hash = hash((StateMemberBase, self._hash_number))
 
     def __hash__(self) -> int:
-        return hash((StateMemberBase, self._hash_number))
-
-    def __eq__(self, other: 'StateMember') -> bool:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        # hash numbers are unique, so equal members are usually the very same object
+        if self is other:
+            return True
+        if not isinstance(other, StateMember):
+            return NotImplemented
         return self._hash_number == other._hash_number
 
 
 class StateAttribute(StateMember):
-    pass
+    __slots__ = ()
 
 
 class StateMethod(StateMember):
-    pass
+    __slots__ = ()
 
 
 class StateTransition(StateMember):
+    __slots__ = ('to', '_resolved_to')
+
     def __init__(self, *args, to: Union[str, Type], **kwargs):
         super().__init__(*args, **kwargs)
         self.to = to
+        # 'to' might be a name, which is resolved in the module of the implementation
+        self._resolved_to: Dict[str, Type] = {}
+
+    def resolve_to(self, module: str) -> Type:
+        try:
+            return self._resolved_to[module]
+        except KeyError:
+            resolved_to = resolve_type(module, type_=self.to)
+            self._resolved_to[module] = resolved_to
+            return resolved_to
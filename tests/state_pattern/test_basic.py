@@ -118,3 +118,66 @@ def test():
     article.arrived_at_customer()
     assert isinstance(article.state, Sold)
     assert round(article.margin, 4) == round(1.4000, 4)
+
+
+class Reorder(ArticleState, state_cls_type='holder', default_state_cls=Demanded):
+    state: ArticleState
+
+    def __init__(self, state: Optional[ArticleState] = None):
+        self.state = state or Demanded()
+
+
+def test_holders_sharing_a_definition():
+    assert Article.__dict__['stock_location'] is Reorder.__dict__['stock_location']
+
+    reorder = Reorder(state=Ordered(cost=2.5))
+    assert reorder.cost == 2.5
+
+    with pytest.raises(
+        StateError,
+        match='Member stock_location is not available on class Reorder in state Ordered.',
+    ):
+        _ = reorder.stock_location
+
+
+class CounterState(StateDefinition, state_cls_type='definition'):
+    __slots__ = ()
+
+    count: int
+
+    @state_transition(to='Counting')
+    def start(self) -> 'Counting':
+        ...
+
+
+class Idle(CounterState, state_cls_type='state'):
+    __slots__ = ()
+
+    def start(self) -> 'Counting':
+        return Counting(count=0)
+
+
+class Counting(CounterState, state_cls_type='state'):
+    __slots__ = ('count',)
+
+    def __init__(self, count: int):
+        self.count = count
+
+
+class Counter(CounterState, state_cls_type='holder', default_state_cls=Idle):
+    __slots__ = ('state',)
+
+    state: CounterState
+
+    def __init__(self, state: Optional[CounterState] = None):
+        self.state = state or Idle()
+
+
+def test_slots():
+    counter = Counter()
+    counter.start()
+
+    assert isinstance(counter.state, Counting)
+    assert counter.count == 0
+    assert not hasattr(counter, '__dict__')
+    assert not hasattr(counter.state, '__dict__')
@@ -0,0 +1,67 @@
+# Standard Library
+import functools
+import inspect
+
+# Patterns
+from patterns.state._common import get_init_param_annotations
+
+
+def keep_signature(init):
+    @functools.wraps(init)
+    def wrapper(*args, **kwargs):
+        return init(*args, **kwargs)
+
+    return wrapper
+
+
+class Plain:
+    def __init__(self, a: int, /, b, *, c: str = ''):
+        ...
+
+
+class Variadic:
+    def __init__(self, a: int, *args: str, b: float, **kwargs: bool):
+        ...
+
+
+class Decorated:
+    @keep_signature
+    def __init__(self, a: int):
+        ...
+
+
+class Inherited(Plain):
+    pass
+
+
+class NoInit:
+    pass
+
+
+def test_positional_and_keyword_only():
+    assert dict(get_init_param_annotations(Plain)) == {
+        'self': inspect.Parameter.empty,
+        'a': int,
+        'b': inspect.Parameter.empty,
+        'c': str,
+    }
+
+
+def test_variadic():
+    annotations = get_init_param_annotations(Variadic)
+    assert list(annotations) == ['self', 'a', 'b', 'args', 'kwargs']
+    assert annotations['args'] is str
+    assert annotations['b'] is float
+    assert annotations['kwargs'] is bool
+
+
+def test_decorated_init_is_unwrapped():
+    assert dict(get_init_param_annotations(Decorated)) == {
+        'self': inspect.Parameter.empty,
+        'a': int,
+    }
+
+
+def test_without_own_init():
+    assert get_init_param_annotations(Inherited) == get_init_param_annotations(Plain)
+    assert dict(get_init_param_annotations(NoInit)) == {}
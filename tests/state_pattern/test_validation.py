@@ -0,0 +1,83 @@
+# Third Party
+import pytest
+
+# Patterns
+from patterns.state import StateConfigError, StateDefinition, state_transition
+
+
+class LampState(StateDefinition, state_cls_type='definition'):
+    brightness: int
+
+    @state_transition(to='On')
+    def switch_on(self) -> 'On':
+        ...
+
+    @state_transition(to='Off')
+    def switch_off(self) -> 'Off':
+        ...
+
+
+class Off(LampState, state_cls_type='state'):
+    def switch_on(self) -> 'On':
+        return On(brightness=100)
+
+
+class On(LampState, state_cls_type='state'):
+    def __init__(self, brightness: int):
+        self.brightness = brightness
+
+    def switch_off(self) -> 'Off':
+        return Off()
+
+
+class Broken(LampState, state_cls_type='state'):
+    def switch_off(self) -> 'Off':
+        return Off()
+
+
+def test_unreachable_state():
+    with pytest.raises(
+        StateConfigError,
+        match='Cannot reach all state-classes via transitions from Off.',
+    ):
+
+        class Lamp(LampState, state_cls_type='holder', default_state_cls=Off):
+            state: LampState
+
+
+class PState(StateDefinition, state_cls_type='definition'):
+    common: int
+
+
+class P(PState, state_cls_type='state'):
+    common = 1
+
+
+class QState(StateDefinition, state_cls_type='definition'):
+    common: int
+
+
+class Q(QState, state_cls_type='state'):
+    common = 2
+
+
+class RState(StateDefinition, state_cls_type='definition'):
+    common: int
+
+
+class R(RState, state_cls_type='state'):
+    common = 3
+
+
+def test_definition_overlap_reports_every_pair():
+    with pytest.raises(StateConfigError) as exc_info:
+
+        class Holder(PState, state_cls_type='holder', default_state_cls=P):
+            p: PState
+            q: QState
+            r: RState
+
+    message = str(exc_info.value)
+    for name1, name2 in [('p', 'q'), ('p', 'r'), ('q', 'r')]:
+        assert f'state-attributes {name1} and {name2} ' in message
+    assert message.count('have common member names {') == 3